@@ -0,0 +1,92 @@
+from pathlib import Path, PurePosixPath
+from fnmatch import fnmatch
+from typing import IO
+import json
+import logging
+import mmap
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+
+class ExportArchive:
+    """
+    Read-only view on a GDPR export zip, without extracting it.
+
+    The zip is memory mapped and its central directory is used as the index,
+    so listing and counting members never touches the member data. Members are
+    keyed by their full path in the zip; patterns and bare names are matched on
+    the file name, regardless of the folder it sits in.
+    """
+
+    def __init__(self, zip_path: Path):
+        self.path = zip_path
+        self._file = open(zip_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.zip = zipfile.ZipFile(self._mmap)
+        self.index = {
+            info.filename: info for info in self.zip.infolist() if not info.is_dir()
+        }
+
+    @classmethod
+    def find(cls, folder: Path, pattern: str = "*.zip") -> "ExportArchive":
+        """Open the most recently modified archive matching pattern in folder."""
+        archives = sorted(folder.glob(pattern), key=lambda path: path.stat().st_mtime)
+        if not archives:
+            raise FileNotFoundError(f"No export archive matching {pattern} in {folder}")
+        if len(archives) > 1:
+            logger.warning(
+                f"{len(archives)} archives match {pattern} in {folder}, "
+                f"using the newest: {archives[-1].name}"
+            )
+        return cls(archives[-1])
+
+    def glob(self, pattern: str) -> list[zipfile.ZipInfo]:
+        return [
+            info
+            for path, info in self.index.items()
+            if fnmatch(PurePosixPath(path).name, pattern)
+        ]
+
+    def count(self, pattern: str) -> int:
+        return sum(
+            1 for path in self.index if fnmatch(PurePosixPath(path).name, pattern)
+        )
+
+    def member(self, name: str) -> zipfile.ZipInfo:
+        """Look up a member by its full path, or by file name when that is unique."""
+        if name in self.index:
+            return self.index[name]
+        matches = [
+            info
+            for path, info in self.index.items()
+            if PurePosixPath(path).name == name
+        ]
+        if not matches:
+            raise KeyError(f"No member {name} in {self.path.name}")
+        if len(matches) > 1:
+            raise ValueError(
+                f"{name} is ambiguous in {self.path.name}: "
+                f"{[info.filename for info in matches]}"
+            )
+        return matches[0]
+
+    def open(self, member: str | zipfile.ZipInfo) -> IO[bytes]:
+        if isinstance(member, str):
+            member = self.member(member)
+        return self.zip.open(member)
+
+    def read_json(self, member: str | zipfile.ZipInfo):
+        with self.open(member) as f:
+            return json.load(f)
+
+    def close(self):
+        self.zip.close()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     HETZNER_SECRET_KEY: str
     HETZNER_URL: str
     HETZNER_BUCKET_NAME: str = "z-sports-history"
+    HR_REST: int = 50
+    HR_MAX: int = 190
 
     class Config:
         env_file = ".env"
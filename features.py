@@ -0,0 +1,264 @@
+from pathlib import Path
+from typing import Callable
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from archive import ExportArchive
+from config import DATA_PATH, settings
+from polar_training import convert_distance_km, parse_duration_h
+
+logger = logging.getLogger(__name__)
+
+FEATURE_PATH = DATA_PATH / "features"
+
+# Bump whenever a metric definition below changes, so cached rows get recomputed.
+FEATURE_VERSION = 1
+
+HR_ZONE_EDGES = np.array([0.6, 0.7, 0.8, 0.9])  # fraction of HR max, 5 zones
+SPEED_ZONE_EDGES_KMH = np.array([10.0, 20.0, 30.0, 40.0])  # 5 zones
+MOVING_SPEED_KMH = 1.0
+MAX_SAMPLE_GAP_S = 30.0  # longer gaps between samples are pauses
+
+HR_ZONE_COLUMNS = [f"hr_zone_{i}_hours" for i in range(1, len(HR_ZONE_EDGES) + 2)]
+SPEED_ZONE_COLUMNS = [
+    f"speed_zone_{i}_hours" for i in range(1, len(SPEED_ZONE_EDGES_KMH) + 2)
+]
+POLAR_COLUMNS = [
+    "duration_hours",
+    "moving_time_hours",
+    "distance_km",
+    "average_speed_kmh",
+    "average_heart_rate",
+    "max_heart_rate",
+    "hr_load",
+    *HR_ZONE_COLUMNS,
+    *SPEED_ZONE_COLUMNS,
+]
+
+
+def metric_version() -> str:
+    definition = (
+        f"{FEATURE_VERSION}:{settings.HR_REST}:{settings.HR_MAX}:"
+        f"{HR_ZONE_EDGES.tolist()}:{SPEED_ZONE_EDGES_KMH.tolist()}:"
+        f"{MOVING_SPEED_KMH}:{MAX_SAMPLE_GAP_S}"
+    )
+    return hashlib.sha1(definition.encode("utf-8")).hexdigest()[:12]
+
+
+def training_load(duration_min, average_heart_rate):
+    """Banister TRIMP from duration and average heart rate, NaN without heart rate."""
+    hr_reserve = (np.asarray(average_heart_rate, dtype=float) - settings.HR_REST) / (
+        settings.HR_MAX - settings.HR_REST
+    )
+    hr_reserve = np.clip(hr_reserve, 0.0, 1.0)
+    return (
+        np.asarray(duration_min, dtype=float)
+        * hr_reserve
+        * 0.64
+        * np.exp(1.92 * hr_reserve)
+    )
+
+
+def sample_intervals(time_s: np.ndarray) -> np.ndarray:
+    """Seconds between consecutive samples, with pauses and clock jumps counted as 0."""
+    dt = np.diff(time_s)
+    dt[(dt < 0) | (dt > MAX_SAMPLE_GAP_S)] = 0.0
+    return dt
+
+
+def time_in_zones(time_s: np.ndarray, values: np.ndarray, edges: np.ndarray):
+    """Hours spent in each zone, attributing every sample interval to its first sample."""
+    if len(time_s) < 2:
+        return np.zeros(len(edges) + 1)
+    dt = sample_intervals(time_s)
+    zones = np.digitize(values[:-1], edges)
+    return np.bincount(zones, weights=dt, minlength=len(edges) + 1) / 3600.0
+
+
+def moving_time_hours(time_s: np.ndarray, speed_kmh: np.ndarray) -> float:
+    if len(time_s) < 2:
+        return np.nan
+    dt = sample_intervals(time_s)
+    return dt[speed_kmh[:-1] > MOVING_SPEED_KMH].sum() / 3600.0
+
+
+def sample_stream(samples: dict, name: str) -> tuple[np.ndarray, np.ndarray]:
+    stream = [s for s in samples.get(name, []) if s.get("value") is not None]
+    if not stream:
+        return np.empty(0), np.empty(0)
+    time_s = (
+        pd.to_datetime([s["dateTime"] for s in stream], format="ISO8601")
+        .to_numpy()
+        .astype("datetime64[ms]")
+        .astype(float)
+        / 1000.0
+    )
+    values = np.fromiter((s["value"] for s in stream), dtype=float, count=len(stream))
+    return time_s, values
+
+
+def load_feature_table(name: str, folder: Path = FEATURE_PATH) -> pd.DataFrame:
+    try:
+        table = pd.read_csv(
+            folder / f"{name}.csv",
+            dtype={"activity_id": str, "input_hash": str, "metric_version": str},
+        )
+    except FileNotFoundError:
+        table = pd.DataFrame(columns=["activity_id", "input_hash", "metric_version"])
+    return table.set_index("activity_id")
+
+
+def update_feature_table(
+    name: str,
+    input_hashes: pd.Series,
+    compute: Callable[[pd.Index], pd.DataFrame],
+    folder: Path = FEATURE_PATH,
+) -> pd.DataFrame:
+    """
+    Bring the cached feature table in sync with the current inputs.
+
+    input_hashes maps activity_id to a hash of everything the metrics read.
+    Only activities whose hash or the metric version changed are passed to
+    compute; activities that disappeared from the inputs are dropped.
+    """
+    table = load_feature_table(name, folder)
+    version = metric_version()
+
+    cached = table.reindex(input_hashes.index)
+    stale = input_hashes.index[
+        (cached["input_hash"] != input_hashes) | (cached["metric_version"] != version)
+    ]
+    logger.info(
+        f"Features {name}: {len(stale)} of {len(input_hashes)} activities to compute"
+    )
+
+    if len(stale):
+        # activities compute could not handle stay in the table as NaN rows
+        fresh = compute(stale).reindex(stale)
+        fresh["input_hash"] = input_hashes.loc[stale]
+        fresh["metric_version"] = version
+        table = pd.concat([table.drop(index=stale, errors="ignore"), fresh])
+
+    table = table.loc[input_hashes.index]
+    folder.mkdir(parents=True, exist_ok=True)
+    table.to_csv(folder / f"{name}.csv", index_label="activity_id")
+    return table
+
+
+def strava_features(df: pd.DataFrame) -> pd.DataFrame:
+    def column(name: str) -> pd.Series:
+        if name not in df:
+            return pd.Series(np.nan, index=df.index)
+        return pd.to_numeric(df[name], errors="coerce")
+
+    elapsed_hours = column("Elapsed Time").to_numpy() / 3600.0
+    moving_hours = column("Moving Time").to_numpy() / 3600.0
+    moving_hours = np.where(np.isnan(moving_hours), elapsed_hours, moving_hours)
+    distance_km = np.nan_to_num(column("Distance").to_numpy())
+    average_heart_rate = column("Average Heart Rate").to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_speed = np.where(moving_hours > 0, distance_km / moving_hours, np.nan)
+
+    return pd.DataFrame(
+        {
+            "duration_hours": elapsed_hours,
+            "moving_time_hours": moving_hours,
+            "distance_km": distance_km,
+            "average_speed_kmh": average_speed,
+            "average_heart_rate": average_heart_rate,
+            "max_heart_rate": column("Max Heart Rate").to_numpy(),
+            "hr_load": training_load(moving_hours * 60.0, average_heart_rate),
+        },
+        index=df.index,
+    )
+
+
+def update_strava_features(df: pd.DataFrame) -> pd.DataFrame:
+    inputs = df.set_index(df["Activity ID"].astype(str).rename("activity_id"))
+    input_columns = [
+        c
+        for c in [
+            "Elapsed Time",
+            "Moving Time",
+            "Distance",
+            "Average Heart Rate",
+            "Max Heart Rate",
+        ]
+        if c in inputs
+    ]
+    input_hashes = (
+        pd.util.hash_pandas_object(inputs[input_columns], index=False)
+        .astype(str)
+        .rename("input_hash")
+    )
+    return update_feature_table(
+        "strava", input_hashes, lambda ids: strava_features(inputs.loc[ids])
+    )
+
+
+def polar_training_features(data: dict) -> dict:
+    elapsed_hours = parse_duration_h(data.get("duration", "PT0S"))
+    distance_km = convert_distance_km(data.get("distance"))
+    average_heart_rate = data.get("averageHeartRate", np.nan)
+
+    samples = data.get("exercises", [{}])[0].get("samples", {})
+    hr_time, hr = sample_stream(samples, "heartRate")
+    speed_time, speed = sample_stream(samples, "speed")
+
+    moving_hours = moving_time_hours(speed_time, speed)
+    if np.isnan(moving_hours):
+        moving_hours = elapsed_hours
+
+    if len(hr):
+        # per-sample TRIMP integrates intensity over the session instead of using the mean
+        hr_load = training_load(sample_intervals(hr_time) / 60.0, hr[:-1]).sum()
+    else:
+        hr_load = training_load(moving_hours * 60.0, average_heart_rate)
+
+    hr_zones = time_in_zones(hr_time, hr, HR_ZONE_EDGES * settings.HR_MAX)
+    speed_zones = time_in_zones(speed_time, speed, SPEED_ZONE_EDGES_KMH)
+
+    return (
+        {
+            "duration_hours": elapsed_hours,
+            "moving_time_hours": moving_hours,
+            "distance_km": distance_km,
+            "average_speed_kmh": distance_km / moving_hours
+            if moving_hours > 0
+            else np.nan,
+            "average_heart_rate": average_heart_rate,
+            "max_heart_rate": data.get("maximumHeartRate", np.nan),
+            "hr_load": float(hr_load),
+        }
+        | dict(zip(HR_ZONE_COLUMNS, hr_zones))
+        | dict(zip(SPEED_ZONE_COLUMNS, speed_zones))
+    )
+
+
+def update_polar_features(archive: ExportArchive) -> pd.DataFrame:
+    # keyed by the full member path, file names repeat across export folders
+    members = {info.filename: info for info in archive.glob("training-*.json")}
+    # CRC and size from the zip central directory identify the content without reading it
+    input_hashes = pd.Series(
+        {name: f"{info.CRC:08x}-{info.file_size}" for name, info in members.items()},
+        name="input_hash",
+        dtype=str,
+    )
+
+    def compute(ids: pd.Index) -> pd.DataFrame:
+        rows = {}
+        for name in ids:
+            try:
+                rows[name] = polar_training_features(archive.read_json(members[name]))
+            except Exception as e:
+                logger.warning(f"Error computing features for {name}: {e}")
+                rows[name] = {}
+        return pd.DataFrame.from_dict(rows, orient="index").reindex(
+            columns=POLAR_COLUMNS
+        )
+
+    return update_feature_table("polar", input_hashes, compute)
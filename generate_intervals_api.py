@@ -0,0 +1,219 @@
+from pathlib import Path
+import json
+import keyword
+import re
+import subprocess
+import sys
+
+SPEC_PATH = Path(__file__).parent / "intervals-openapi-spec.json"
+OUTPUT_PATH = Path(__file__).parent / "intervals_api.py"
+API_PREFIX = "/api/v1"
+
+# operationIds of the endpoints the client exposes
+OPERATIONS = [
+    "listActivities",
+    "getActivityStreams",
+    "getActivityPowerCurve",
+    "getActivityHRCurve",
+    "getActivityPaceCurve",
+    "listActivityPowerCurves",
+    "listActivityHRCurves",
+]
+
+SCALARS = {"string": "str", "integer": "int", "number": "float", "boolean": "bool"}
+# the API sends floats for some fields the spec calls integer (e.g. 140.5 bpm),
+# and one such value would fail the decode of a whole activity list
+FIELD_SCALARS = SCALARS | {"integer": "int | float"}
+
+
+def snake_case(name: str) -> str:
+    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+
+
+def python_name(name: str) -> str:
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+
+def ref_name(schema: dict) -> str:
+    return schema["$ref"].rsplit("/", 1)[-1]
+
+
+def annotation(schema: dict, scalars: dict[str, str] = SCALARS) -> str:
+    if "$ref" in schema:
+        return ref_name(schema)
+    kind = schema.get("type")
+    if kind == "array":
+        return f"list[{annotation(schema.get('items', {}), scalars)}]"
+    if kind == "object" and "additionalProperties" in schema:
+        return f"dict[str, {annotation(schema['additionalProperties'], scalars)}]"
+    return scalars.get(kind, "Any")
+
+
+def referenced(schema, found: set[str]):
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == "$ref":
+                found.add(value.rsplit("/", 1)[-1])
+            else:
+                referenced(value, found)
+    elif isinstance(schema, list):
+        for value in schema:
+            referenced(value, found)
+
+
+def response_schema(operation: dict) -> dict:
+    response = operation["responses"].get("200") or operation["responses"]["default"]
+    return next(iter(response["content"].values()))["schema"]
+
+
+def find_operations(spec: dict) -> dict[str, tuple[str, dict]]:
+    operations = {}
+    for path, methods in spec["paths"].items():
+        operation = methods.get("get")
+        if operation and operation.get("operationId") in OPERATIONS:
+            operations[operation["operationId"]] = (path, operation)
+    return operations
+
+
+def collect_schemas(spec: dict, roots: list[dict]) -> list[str]:
+    schemas = spec["components"]["schemas"]
+    found = set()
+    referenced(roots, found)
+    pending = list(found)
+    while pending:
+        name = pending.pop()
+        nested = set()
+        referenced(schemas[name], nested)
+        pending.extend(nested - found)
+        found |= nested
+    return sorted(found)
+
+
+def render_struct(name: str, schema: dict) -> str:
+    lines = [f"class {name}(msgspec.Struct, kw_only=True, omit_defaults=True):"]
+    properties = schema.get("properties", {})
+    for prop, prop_schema in properties.items():
+        field = python_name(prop)
+        default = (
+            f'msgspec.field(default=None, name="{prop}")' if field != prop else "None"
+        )
+        lines.append(
+            f"    {field}: {annotation(prop_schema, FIELD_SCALARS)} | None = {default}"
+        )
+    if not properties:
+        lines.append("    pass")
+    return "\n".join(lines)
+
+
+def decoder_name(schema: dict) -> str:
+    if schema.get("type") == "array":
+        return f"{snake_case(annotation(schema['items']))}_list_decoder".upper()
+    return f"{snake_case(annotation(schema))}_decoder".upper()
+
+
+def render_operation(path: str, operation: dict) -> str:
+    method = snake_case(operation["operationId"])
+    schema = response_schema(operation)
+
+    # responses are decoded as JSON, so `{ext}` (.csv, .json, ...) is left empty
+    path = path.removeprefix(API_PREFIX).replace("{ext}", "")
+    parameters = [p for p in operation.get("parameters", []) if p["name"] != "ext"]
+    required = [p for p in parameters if p.get("required")]
+    optional = [p for p in parameters if not p.get("required")]
+
+    arguments = ["self"]
+    for parameter in required:
+        arguments.append(
+            f"{python_name(parameter['name'])}: {annotation(parameter['schema'])}"
+        )
+    for parameter in optional:
+        arguments.append(
+            f"{python_name(parameter['name'])}: {annotation(parameter['schema'])} | None = None"
+        )
+
+    lines = [f"    def {method}({', '.join(arguments)}) -> {annotation(schema)}:"]
+    if operation.get("summary"):
+        lines.append(f'        """{operation["summary"]}"""')
+
+    query = [p for p in parameters if p["in"] == "query"]
+    lines.append("        params = {")
+    for parameter in query:
+        name = python_name(parameter["name"])
+        value = (
+            f"join_array({name})"
+            if parameter["schema"].get("type") == "array"
+            else name
+        )
+        lines.append(f'            "{parameter["name"]}": {value},')
+    lines.append("        }")
+
+    url_path = re.sub(r"\{(\w+)\}", lambda m: "{" + python_name(m.group(1)) + "}", path)
+    lines.append(f'        content = self.request(f"{url_path}", params)')
+    lines.append(f"        return {decoder_name(schema)}.decode(content)")
+    return "\n".join(lines)
+
+
+def generate(spec_path: Path = SPEC_PATH, output_path: Path = OUTPUT_PATH):
+    with open(spec_path, "r") as f:
+        spec = json.load(f)
+
+    operations = find_operations(spec)
+    missing = set(OPERATIONS) - set(operations)
+    if missing:
+        raise ValueError(f"Operations not found in {spec_path.name}: {missing}")
+
+    responses = [response_schema(operation) for _, operation in operations.values()]
+    schemas = spec["components"]["schemas"]
+
+    parts = [
+        f'"""Generated by {Path(__file__).name} from {spec_path.name}, do not edit."""',
+        # schemas reference each other in any order, so keep annotations lazy
+        "from __future__ import annotations\n\n"
+        "from abc import ABC, abstractmethod\n"
+        "from typing import Any\n\n"
+        "import msgspec",
+    ]
+    parts += [
+        render_struct(name, schemas[name]) for name in collect_schemas(spec, responses)
+    ]
+
+    decoders = {decoder_name(schema): annotation(schema) for schema in responses}
+    parts.append(
+        "\n".join(
+            f"{name} = msgspec.json.Decoder({type_}, strict=False)"
+            for name, type_ in sorted(decoders.items())
+        )
+    )
+    parts.append(
+        """def join_array(values: list | None) -> str | None:
+    if values is None:
+        return None
+    return ",".join(
+        msgspec.json.encode(v).decode() if isinstance(v, msgspec.Struct) else str(v)
+        for v in values
+    )"""
+    )
+    parts.append(
+        '''class IntervalsEndpoints(ABC):
+    """Typed endpoints; subclasses provide request(path, params) -> bytes."""
+
+    @abstractmethod
+    def request(self, path: str, params: dict) -> bytes:
+        """GET path with the non-None params and return the raw response body."""
+
+'''
+        + "\n\n".join(
+            render_operation(path, operation)
+            for path, operation in sorted(operations.values(), key=lambda o: o[0])
+        )
+    )
+
+    output_path.write_text("\n\n\n".join(parts) + "\n")
+    subprocess.run(
+        [sys.executable, "-m", "ruff", "format", str(output_path)], check=False
+    )
+
+
+if __name__ == "__main__":
+    generate()
@@ -1,11 +1,27 @@
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import zipfile
 import boto3
+from botocore.exceptions import BotoCoreError, ClientError, IncompleteReadError
 from config import settings
 from mypy_boto3_s3 import S3Client
 
+logger = logging.getLogger(__name__)
+
+MIRROR_MANIFEST = ".mirror.json"
+MIRROR_CHUNK_SIZE = 64 * 1024 * 1024
+MIRROR_RETRIES = 4
 
-class HetznerS3Client:
 
+class HetznerS3Client:
     def __init__(self, bucket_name: str = None, data_path: Path = None):
         self.client: S3Client = boto3.client(
             "s3",
@@ -53,6 +69,193 @@ class HetznerS3Client:
 
         self.client.download_file(bucket_name, object_name, str(file_path))
 
+    def list_objects(self, bucket_name: str = None, prefix: str = ""):
+        if bucket_name is None:
+            if self.target_bucket is None:
+                raise ValueError(
+                    "Bucket name must be provided either as an argument or set as target bucket."
+                )
+            bucket_name = self.target_bucket
+
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith("/"):
+                    yield obj
+
+    def mirror(
+        self,
+        bucket_name: str = None,
+        data_path: Path = None,
+        prefix: str = "",
+        unpack: bool = True,
+        max_workers: int = 8,
+        chunk_size: int = MIRROR_CHUNK_SIZE,
+    ) -> list[Path]:
+        """
+        Mirror a bucket into data_path, keeping the object keys as relative paths.
+
+        Objects whose ETag and size match the local manifest (or whose local
+        content hashes to the ETag) are skipped. Everything else is fetched as
+        ranged chunks in parallel, written into a `.part` file named after the
+        ETag. Every finished chunk is logged next to the part file, so an
+        interrupted or failed run resumes with the chunks that are missing. The
+        assembled file is checked against single-part (MD5) ETags.
+        Zip archives are unpacked next to the archive once complete.
+        """
+        if bucket_name is None:
+            if self.target_bucket is None:
+                raise ValueError(
+                    "Bucket name must be provided either as an argument or set as target bucket."
+                )
+            bucket_name = self.target_bucket
+
+        if data_path is None:
+            if self.data_path is None:
+                raise ValueError(
+                    "Data path must be provided either as an argument or set as data path."
+                )
+            data_path = self.data_path
+
+        manifest_path = data_path / MIRROR_MANIFEST
+        manifest = read_manifest(manifest_path)
+
+        pending = {}
+        for obj in self.list_objects(bucket_name, prefix=prefix):
+            file_path = data_path / obj["Key"]
+            if manifest.get(obj["Key"]) == manifest_entry(obj) and file_path.exists():
+                continue
+            pending[obj["Key"]] = obj
+
+        logger.info(f"Mirroring {len(pending)} objects from {bucket_name}")
+
+        mirrored = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {}
+            remaining = {}
+            for key, obj in pending.items():
+                file_path = data_path / key
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+
+                if is_local_copy(file_path, obj):
+                    remaining[key] = set()
+                    continue
+
+                part_path = part_file_path(file_path, obj)
+                chunks = {
+                    (start, min(start + chunk_size, obj["Size"]))
+                    for start in range(0, obj["Size"], chunk_size)
+                } - read_done_chunks(part_path)
+                remaining[key] = chunks
+                with open(part_path, "ab") as f:
+                    f.truncate(obj["Size"])
+
+                for start, end in chunks:
+                    future = pool.submit(
+                        self.download_range, bucket_name, obj, part_path, start, end
+                    )
+                    futures[future] = (key, (start, end))
+
+            def finish(key: str):
+                obj = pending[key]
+                file_path = data_path / key
+                part_path = part_file_path(file_path, obj)
+                if part_path.exists():
+                    if not md5_matches(part_path, obj):
+                        part_path.unlink()
+                        done_chunks_path(part_path).unlink(missing_ok=True)
+                        raise ValueError(
+                            f"Downloaded {key} does not match its ETag, discarded"
+                        )
+                    part_path.replace(file_path)
+                    done_chunks_path(part_path).unlink(missing_ok=True)
+                # parts of earlier versions of the object can never be resumed
+                for stale_path in stale_part_files(file_path):
+                    stale_path.unlink(missing_ok=True)
+                if unpack and zipfile.is_zipfile(file_path):
+                    unpack_zip(file_path, file_path.parent)
+                manifest[key] = manifest_entry(obj)
+                write_manifest(manifest, manifest_path)
+                mirrored.append(file_path)
+                logger.info(f"Mirrored {key}")
+
+            # drain every chunk before raising, so the ones that did arrive are kept
+            errors = []
+
+            def try_finish(key: str):
+                try:
+                    finish(key)
+                except Exception as e:
+                    logger.error(f"Failed to finish {key}: {e}")
+                    errors.append(e)
+
+            for key in [key for key, chunks in remaining.items() if not chunks]:
+                try_finish(key)
+
+            for future in as_completed(futures):
+                key, chunk = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Failed to download {key} at byte {chunk[0]}: {e}")
+                    errors.append(e)
+                    continue
+                remaining[key].discard(chunk)
+                if not remaining[key]:
+                    try_finish(key)
+
+        if errors:
+            raise errors[0]
+        return mirrored
+
+    def download_range(
+        self, bucket_name: str, obj: dict, part_path: Path, start: int, end: int
+    ):
+        """Write bytes [start, end) of obj into part_path and log the chunk as done."""
+        for attempt in range(MIRROR_RETRIES):
+            try:
+                self.write_range(bucket_name, obj, part_path, start, end)
+                break
+            except (BotoCoreError, ClientError) as e:
+                if not is_transient(e) or attempt == MIRROR_RETRIES - 1:
+                    raise
+                logger.warning(
+                    f"Retrying {obj['Key']} at byte {start} after error: {e}"
+                )
+                time.sleep(2**attempt)
+
+        # a single short append per chunk, safe to share between workers; the
+        # end is logged too, so a resume with another chunk_size cannot match
+        # a range that was only partly written
+        with open(done_chunks_path(part_path), "a") as f:
+            f.write(f"{start}-{end}\n")
+
+    def write_range(
+        self, bucket_name: str, obj: dict, part_path: Path, start: int, end: int
+    ):
+        response = self.client.get_object(
+            Bucket=bucket_name,
+            Key=obj["Key"],
+            Range=f"bytes={start}-{end - 1}",
+            IfMatch=obj["ETag"],
+        )
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            offset = start
+            for block in response["Body"].iter_chunks(chunk_size=1024 * 1024):
+                view = memoryview(block)
+                while view:
+                    written = os.pwrite(fd, view, offset)
+                    offset += written
+                    view = view[written:]
+        finally:
+            os.close(fd)
+
+        if offset != end:
+            raise IncompleteReadError(
+                actual_bytes=offset - start, expected_bytes=end - start
+            )
+
     def set_cors(
         self,
         allowed_origins: list[str],
@@ -92,14 +295,117 @@ class HetznerS3Client:
         return self.client.get_bucket_cors(Bucket=bucket_name)
 
 
-client = HetznerS3Client(bucket_name="public-plots")
-client.set_cors(
-    allowed_methods=["GET", "HEAD"],
-    allowed_origins=[
-        "https://sethvanwieringen.eu",
-        "http://localhost:4321",
-        "http://127.0.0.1:4321",
-    ],
-)
+def manifest_entry(obj: dict) -> dict:
+    return {"etag": obj["ETag"].strip('"'), "size": obj["Size"]}
+
+
+def read_manifest(manifest_path: Path) -> dict:
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(manifest: dict, manifest_path: Path):
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path.replace(manifest_path)
+
+
+def part_file_path(file_path: Path, obj: dict) -> Path:
+    etag = obj["ETag"].strip('"')
+    return file_path.with_name(f"{file_path.name}.{etag}.part")
+
+
+def stale_part_files(file_path: Path) -> list[Path]:
+    """Part files and chunk logs left behind for any ETag of file_path."""
+    pattern = re.compile(
+        rf"{re.escape(file_path.name)}\.[0-9a-fA-F]+(-\d+)?\.part(\.chunks)?"
+    )
+    return [
+        path
+        for path in file_path.parent.glob(f"{glob.escape(file_path.name)}.*.part*")
+        if pattern.fullmatch(path.name)
+    ]
+
+
+def is_transient(error: Exception) -> bool:
+    # a changed ETag (412) or missing object will not succeed on retry
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        code = error.response.get("Error", {}).get("Code", "")
+        return status >= 500 or code in ("SlowDown", "RequestTimeout", "Throttling")
+    return True
+
+
+def done_chunks_path(part_path: Path) -> Path:
+    return part_path.with_name(f"{part_path.name}.chunks")
+
+
+def read_done_chunks(part_path: Path) -> set[tuple[int, int]]:
+    if not part_path.exists():
+        return set()
+    done = set()
+    try:
+        with open(done_chunks_path(part_path), "r") as f:
+            for line in f:
+                start, sep, end = line.strip().partition("-")
+                # logs without an end are from before ranges were logged, refetch
+                if sep:
+                    done.add((int(start), int(end)))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def is_local_copy(file_path: Path, obj: dict) -> bool:
+    """Single-part ETags are the MD5 of the object, so a matching file can be reused."""
+    if not file_path.exists() or file_path.stat().st_size != obj["Size"]:
+        return False
+    if "-" in obj["ETag"]:
+        return False
+    return md5_matches(file_path, obj)
+
+
+def md5_matches(file_path: Path, obj: dict) -> bool:
+    """Check file_path against a single-part ETag; multipart ETags cannot be checked."""
+    etag = obj["ETag"].strip('"')
+    if "-" in etag:
+        return True
+
+    md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        while block := f.read(MIRROR_CHUNK_SIZE):
+            md5.update(block)
+    return md5.hexdigest() == etag
+
+
+def unpack_zip(zip_path: Path, target_folder: Path):
+    target_folder = target_folder.resolve()
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+            member_path = (target_folder / member.filename).resolve()
+            if not member_path.is_relative_to(target_folder):
+                logger.warning(f"Skipping {member.filename} outside {target_folder}")
+                continue
+            member_path.parent.mkdir(parents=True, exist_ok=True)
+            with archive.open(member) as src, open(member_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1024 * 1024)
+
+
+if __name__ == "__main__":
+    client = HetznerS3Client(bucket_name="public-plots")
+    client.set_cors(
+        allowed_methods=["GET", "HEAD"],
+        allowed_origins=[
+            "https://sethvanwieringen.eu",
+            "http://localhost:4321",
+            "http://127.0.0.1:4321",
+        ],
+    )
 
-client.get_cors()
+    client.get_cors()
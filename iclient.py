@@ -3,15 +3,21 @@ from datetime import datetime
 import httpx
 
 from config import DATA_PATH, settings
+from intervals_api import ACTIVITY_LIST_DECODER, Activity, IntervalsEndpoints
 from util import write_to_json_file
 
+# listActivities requires an oldest date, this predates every export
+ACTIVITY_HISTORY_START = datetime(2000, 1, 1)
 
-class IntervalsClient:
+
+class IntervalsClient(IntervalsEndpoints):
     def __init__(self):
         self.api_key = settings.INTERVALS_API_KEY
         self.base_url = "https://intervals.icu/api/v1"
         self.athlete_id = settings.INTERVALS_ATHLETE_ID
         self.data_path = DATA_PATH / str(self.athlete_id)
+        # body of the last request, so callers can cache the response as sent
+        self.last_response: bytes = b""
 
         self.data_path.mkdir(parents=True, exist_ok=True)
 
@@ -31,23 +37,36 @@ class IntervalsClient:
             return workouts
 
     @property
-    def activities(self):
+    def activities(self) -> list[Activity]:
         try:
-            with open(self.data_path / "activities.json", "r") as f:
-                return f.read()
+            with open(self.data_path / "activities.json", "rb") as f:
+                return ACTIVITY_LIST_DECODER.decode(f.read())
         except FileNotFoundError:
             activities = self.get_athlete_activities()
             return activities
 
+    def request(self, path: str, params: dict = None) -> bytes:
+        response = httpx.get(
+            f"{self.base_url}{path}",
+            headers=self.headers,
+            params={k: v for k, v in (params or {}).items() if v is not None},
+        )
+        response.raise_for_status()
+        self.last_response = response.content
+        return response.content
+
     def get_athlete_workouts(self):
         url = f"{self.base_url}/athlete/{self.athlete_id}/workouts"
         response = httpx.get(url, headers=self.headers)
         response.raise_for_status()
 
-        write_to_json_file(response.json(), self.data_path / "workouts.json")
-        return response.json()
+        workouts = response.json()
+        write_to_json_file(workouts, self.data_path / "workouts.json")
+        return workouts
 
-    def get_athlete_activities(self, oldest: datetime = None, newest: datetime = None):
+    def get_athlete_activities(
+        self, oldest: datetime = ACTIVITY_HISTORY_START, newest: datetime = None
+    ) -> list[Activity]:
         """
         query parameters:
             oldest::string
@@ -56,16 +75,17 @@ class IntervalsClient:
             newest::string
             Local ISO-8601 date or date and time, defaults to now
         """
-        url = f"{self.base_url}/athlete/{self.athlete_id}/activities"
-        response = httpx.get(
-            url,
-            headers=self.headers,
-            params={"oldest": oldest, "newest": newest},
+        activities = self.list_activities(
+            self.athlete_id,
+            oldest=oldest.isoformat(),
+            newest=newest.isoformat() if newest else None,
         )
-        response.raise_for_status()
 
-        write_to_json_file(response.json(), self.data_path / "activities.json")
-        return response.json()
+        # the raw response is cached, re-encoding the structs would drop
+        # nulls and any fields the spec does not list
+        with open(self.data_path / "activities.json", "wb") as f:
+            f.write(self.last_response)
+        return activities
 
     def get_activities_as_csv(self):
         url = f"{self.base_url}/athlete/{self.athlete_id}/activities.csv"
@@ -78,6 +98,7 @@ class IntervalsClient:
         return response.text
 
 
-client = IntervalsClient()
+if __name__ == "__main__":
+    client = IntervalsClient()
 
-client.get_activities_as_csv()
+    client.get_activities_as_csv()
@@ -0,0 +1,544 @@
+"""Generated by generate_intervals_api.py from intervals-openapi-spec.json, do not edit."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+import msgspec
+
+
+class Activity(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    start_date_local: str | None = None
+    type: str | None = None
+    icu_ignore_time: bool | None = None
+    icu_pm_cp: int | float | None = None
+    icu_pm_w_prime: int | float | None = None
+    icu_pm_p_max: int | float | None = None
+    icu_pm_ftp: int | float | None = None
+    icu_pm_ftp_secs: int | float | None = None
+    icu_pm_ftp_watts: int | float | None = None
+    icu_ignore_power: bool | None = None
+    icu_rolling_cp: float | None = None
+    icu_rolling_w_prime: float | None = None
+    icu_rolling_p_max: float | None = None
+    icu_rolling_ftp: int | float | None = None
+    icu_rolling_ftp_delta: int | float | None = None
+    icu_training_load: int | float | None = None
+    icu_atl: float | None = None
+    icu_ctl: float | None = None
+    ss_p_max: float | None = None
+    ss_w_prime: float | None = None
+    ss_cp: float | None = None
+    paired_event_id: int | float | None = None
+    icu_ftp: int | float | None = None
+    icu_joules: int | float | None = None
+    icu_recording_time: int | float | None = None
+    elapsed_time: int | float | None = None
+    icu_weighted_avg_watts: int | float | None = None
+    carbs_used: int | float | None = None
+    name: str | None = None
+    description: str | None = None
+    start_date: str | None = None
+    distance: float | None = None
+    icu_distance: float | None = None
+    moving_time: int | float | None = None
+    coasting_time: int | float | None = None
+    total_elevation_gain: float | None = None
+    total_elevation_loss: float | None = None
+    timezone: str | None = None
+    trainer: bool | None = None
+    sub_type: str | None = None
+    commute: bool | None = None
+    race: bool | None = None
+    max_speed: float | None = None
+    average_speed: float | None = None
+    device_watts: bool | None = None
+    has_heartrate: bool | None = None
+    max_heartrate: int | float | None = None
+    average_heartrate: int | float | None = None
+    average_cadence: float | None = None
+    calories: int | float | None = None
+    average_temp: float | None = None
+    min_temp: int | float | None = None
+    max_temp: int | float | None = None
+    avg_lr_balance: float | None = None
+    gap: float | None = None
+    gap_model: str | None = None
+    use_elevation_correction: bool | None = None
+    gear: StravaGear | None = None
+    perceived_exertion: float | None = None
+    device_name: str | None = None
+    power_meter: str | None = None
+    power_meter_serial: str | None = None
+    power_meter_battery: str | None = None
+    crank_length: float | None = None
+    external_id: str | None = None
+    file_sport_index: int | float | None = None
+    file_type: str | None = None
+    icu_athlete_id: str | None = None
+    created: str | None = None
+    icu_sync_date: str | None = None
+    analyzed: str | None = None
+    icu_w_prime: int | float | None = None
+    p_max: int | float | None = None
+    threshold_pace: float | None = None
+    icu_hr_zones: list[int | float] | None = None
+    pace_zones: list[float] | None = None
+    lthr: int | float | None = None
+    icu_resting_hr: int | float | None = None
+    icu_weight: float | None = None
+    icu_power_zones: list[int | float] | None = None
+    icu_sweet_spot_min: int | float | None = None
+    icu_sweet_spot_max: int | float | None = None
+    icu_power_spike_threshold: int | float | None = None
+    trimp: float | None = None
+    icu_warmup_time: int | float | None = None
+    icu_cooldown_time: int | float | None = None
+    icu_chat_id: int | float | None = None
+    icu_ignore_hr: bool | None = None
+    ignore_velocity: bool | None = None
+    ignore_pace: bool | None = None
+    ignore_parts: list[Ignore] | None = None
+    icu_training_load_data: int | float | None = None
+    interval_summary: list[str] | None = None
+    skyline_chart_bytes: list[str] | None = None
+    stream_types: list[str] | None = None
+    has_weather: bool | None = None
+    has_segments: bool | None = None
+    power_field_names: list[str] | None = None
+    power_field: str | None = None
+    icu_zone_times: list[ZoneTime] | None = None
+    icu_hr_zone_times: list[int | float] | None = None
+    pace_zone_times: list[int | float] | None = None
+    gap_zone_times: list[int | float] | None = None
+    use_gap_zone_times: bool | None = None
+    custom_zones: list[ZoneSet] | None = None
+    tiz_order: str | None = None
+    polarization_index: float | None = None
+    icu_achievements: list[IcuAchievement] | None = None
+    icu_intervals_edited: bool | None = None
+    lock_intervals: bool | None = None
+    icu_lap_count: int | float | None = None
+    icu_joules_above_ftp: int | float | None = None
+    icu_max_wbal_depletion: int | float | None = None
+    icu_hrr: HRRecovery | None = None
+    icu_sync_error: str | None = None
+    icu_color: str | None = None
+    icu_power_hr_z2: float | None = None
+    icu_power_hr_z2_mins: int | float | None = None
+    icu_cadence_z2: int | float | None = None
+    icu_rpe: int | float | None = None
+    feel: int | float | None = None
+    kg_lifted: float | None = None
+    decoupling: float | None = None
+    icu_median_time_delta: int | float | None = None
+    p30s_exponent: float | None = None
+    workout_shift_secs: int | float | None = None
+    strava_id: str | None = None
+    lengths: int | float | None = None
+    pool_length: float | None = None
+    compliance: float | None = None
+    coach_tick: int | float | None = None
+    source: str | None = None
+    oauth_client_id: int | float | None = None
+    oauth_client_name: str | None = None
+    average_altitude: float | None = None
+    min_altitude: float | None = None
+    max_altitude: float | None = None
+    power_load: int | float | None = None
+    hr_load: int | float | None = None
+    pace_load: int | float | None = None
+    hr_load_type: str | None = None
+    pace_load_type: str | None = None
+    tags: list[str] | None = None
+    attachments: list[Attachment] | None = None
+    recording_stops: list[int | float] | None = None
+    average_weather_temp: float | None = None
+    min_weather_temp: float | None = None
+    max_weather_temp: float | None = None
+    average_feels_like: float | None = None
+    min_feels_like: float | None = None
+    max_feels_like: float | None = None
+    average_wind_speed: float | None = None
+    average_wind_gust: float | None = None
+    prevailing_wind_deg: int | float | None = None
+    headwind_percent: float | None = None
+    tailwind_percent: float | None = None
+    average_clouds: int | float | None = None
+    max_rain: float | None = None
+    max_snow: float | None = None
+    carbs_ingested: int | float | None = None
+    route_id: int | float | None = None
+    pace: float | None = None
+    athlete_max_hr: int | float | None = None
+    group: str | None = None
+    icu_intensity: float | None = None
+    icu_efficiency_factor: float | None = None
+    icu_power_hr: float | None = None
+    session_rpe: int | float | None = None
+    average_stride: float | None = None
+    icu_average_watts: int | float | None = None
+    icu_variability_index: float | None = None
+    strain_score: float | None = None
+
+
+class ActivityFilter(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: int | float | None = None
+    field_id: str | None = None
+    code: str | None = None
+    operator: str | None = None
+    value: Any | None = None
+    not_: bool | None = msgspec.field(default=None, name="not")
+
+
+class ActivityHRCurve(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    start_date_local: str | None = None
+    weight: float | None = None
+    bpm: list[int | float] | None = None
+
+
+class ActivityHRCurvePayload(msgspec.Struct, kw_only=True, omit_defaults=True):
+    secs: list[int | float] | None = None
+    curves: list[ActivityHRCurve] | None = None
+
+
+class ActivityPowerCurve(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    start_date_local: str | None = None
+    weight: float | None = None
+    watts: list[int | float] | None = None
+
+
+class ActivityPowerCurvePayload(msgspec.Struct, kw_only=True, omit_defaults=True):
+    after_kj: int | float | None = None
+    secs: list[int | float] | None = None
+    curves: list[ActivityPowerCurve] | None = None
+
+
+class ActivityStream(msgspec.Struct, kw_only=True, omit_defaults=True):
+    type: str | None = None
+    name: str | None = None
+    data: Any | None = None
+    data2: Any | None = None
+    valueTypeIsArray: bool | None = None
+    anomalies: list[Anomaly] | None = None
+    custom: bool | None = None
+    allNull: bool | None = None
+
+
+class Anomaly(msgspec.Struct, kw_only=True, omit_defaults=True):
+    start_index: int | float | None = None
+    end_index: int | float | None = None
+    value: int | float | None = None
+    valueEnd: int | float | None = None
+
+
+class Attachment(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    filename: str | None = None
+    mimetype: str | None = None
+    url: str | None = None
+
+
+class DataCurvePt(msgspec.Struct, kw_only=True, omit_defaults=True):
+    start_index: int | float | None = None
+    end_index: int | float | None = None
+    secs: int | float | None = None
+    value: int | float | None = None
+
+
+class HRCurve(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    filters: list[ActivityFilter] | None = None
+    label: str | None = None
+    filter_label: str | None = None
+    percentile: float | None = None
+    start_date_local: str | None = None
+    end_date_local: str | None = None
+    days: int | float | None = None
+    moving_time: int | float | None = None
+    training_load: int | float | None = None
+    weight: float | None = None
+    secs: list[int | float] | None = None
+    values: list[int | float] | None = None
+    submax_values: list[list[int | float]] | None = None
+    submax_activity_id: list[list[str]] | None = None
+    start_index: list[int | float] | None = None
+    end_index: list[int | float] | None = None
+    activity_id: list[str] | None = None
+
+
+class HRRecovery(msgspec.Struct, kw_only=True, omit_defaults=True):
+    start_index: int | float | None = None
+    end_index: int | float | None = None
+    start_time: int | float | None = None
+    end_time: int | float | None = None
+    start_bpm: int | float | None = None
+    end_bpm: int | float | None = None
+    average_watts: int | float | None = None
+    hrr: int | float | None = None
+
+
+class IcuAchievement(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    type: str | None = None
+    message: str | None = None
+    watts: int | float | None = None
+    secs: int | float | None = None
+    value: int | float | None = None
+    distance: float | None = None
+    pace: float | None = None
+    point: DataCurvePt | None = None
+
+
+class Ignore(msgspec.Struct, kw_only=True, omit_defaults=True):
+    start_index: int | float | None = None
+    end_index: int | float | None = None
+    power: bool | None = None
+    pace: bool | None = None
+    hr: bool | None = None
+
+
+class PaceCurve(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    filters: list[ActivityFilter] | None = None
+    label: str | None = None
+    filter_label: str | None = None
+    percentile: float | None = None
+    start_date_local: str | None = None
+    end_date_local: str | None = None
+    days: int | float | None = None
+    moving_time: int | float | None = None
+    training_load: int | float | None = None
+    weight: float | None = None
+    distance: list[float] | None = None
+    values: list[int | float] | None = None
+    submax_values: list[list[int | float]] | None = None
+    submax_activity_id: list[list[str]] | None = None
+    start_index: list[int | float] | None = None
+    end_index: list[int | float] | None = None
+    activity_id: list[str] | None = None
+    type: str | None = None
+    paceModels: list[PaceModel] | None = None
+
+
+class PaceModel(msgspec.Struct, kw_only=True, omit_defaults=True):
+    type: str | None = None
+    criticalSpeed: float | None = None
+    dPrime: float | None = None
+    r2: float | None = None
+    inputPointIndexes: list[int | float] | None = None
+
+
+class Plot(msgspec.Struct, kw_only=True, omit_defaults=True):
+    max_bpm: int | float | None = None
+    min_bpm: int | float | None = None
+    secs: list[int | float] | None = None
+    cumulative_secs: list[int | float] | None = None
+
+
+class PowerCurve(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    after_kj: int | float | None = None
+    filters: list[ActivityFilter] | None = None
+    label: str | None = None
+    filter_label: str | None = None
+    percentile: float | None = None
+    start_date_local: str | None = None
+    end_date_local: str | None = None
+    days: int | float | None = None
+    moving_time: int | float | None = None
+    training_load: int | float | None = None
+    weight: float | None = None
+    secs: list[int | float] | None = None
+    values: list[int | float] | None = None
+    submax_values: list[list[int | float]] | None = None
+    submax_activity_id: list[list[str]] | None = None
+    start_index: list[int | float] | None = None
+    end_index: list[int | float] | None = None
+    activity_id: list[str] | None = None
+    watts_per_kg: list[float] | None = None
+    wkg_activity_id: list[str] | None = None
+    submax_watts_per_kg: list[list[float]] | None = None
+    submax_wkg_activity_id: list[list[str]] | None = None
+    powerModels: list[PowerModel] | None = None
+    ranks: dict[str, Rank] | None = None
+    mapPlot: Plot | None = None
+    stream_type: str | None = None
+    stream_name: str | None = None
+    watts: list[int | float] | None = None
+    vo2max_5m: float | None = None
+    compound_score_5m: float | None = None
+
+
+class PowerModel(msgspec.Struct, kw_only=True, omit_defaults=True):
+    type: str | None = None
+    criticalPower: int | float | None = None
+    wPrime: int | float | None = None
+    pMax: int | float | None = None
+    inputPointIndexes: list[int | float] | None = None
+    ftp: int | float | None = None
+
+
+class Rank(msgspec.Struct, kw_only=True, omit_defaults=True):
+    position: dict[str, float] | None = None
+    watts: dict[str, float] | None = None
+
+
+class StravaGear(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    name: str | None = None
+    distance: float | None = None
+    primary: bool | None = None
+
+
+class ZoneInfo(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    start: float | None = None
+    end: float | None = None
+    start_value: float | None = None
+    end_value: float | None = None
+    secs: int | float | None = None
+
+
+class ZoneSet(msgspec.Struct, kw_only=True, omit_defaults=True):
+    code: str | None = None
+    zones: list[ZoneInfo] | None = None
+
+
+class ZoneTime(msgspec.Struct, kw_only=True, omit_defaults=True):
+    id: str | None = None
+    secs: int | float | None = None
+
+
+ACTIVITY_HR_CURVE_PAYLOAD_DECODER = msgspec.json.Decoder(
+    ActivityHRCurvePayload, strict=False
+)
+ACTIVITY_LIST_DECODER = msgspec.json.Decoder(list[Activity], strict=False)
+ACTIVITY_POWER_CURVE_PAYLOAD_DECODER = msgspec.json.Decoder(
+    ActivityPowerCurvePayload, strict=False
+)
+ACTIVITY_STREAM_LIST_DECODER = msgspec.json.Decoder(list[ActivityStream], strict=False)
+HR_CURVE_DECODER = msgspec.json.Decoder(HRCurve, strict=False)
+PACE_CURVE_DECODER = msgspec.json.Decoder(PaceCurve, strict=False)
+POWER_CURVE_DECODER = msgspec.json.Decoder(PowerCurve, strict=False)
+
+
+def join_array(values: list | None) -> str | None:
+    if values is None:
+        return None
+    return ",".join(
+        msgspec.json.encode(v).decode() if isinstance(v, msgspec.Struct) else str(v)
+        for v in values
+    )
+
+
+class IntervalsEndpoints(ABC):
+    """Typed endpoints; subclasses provide request(path, params) -> bytes."""
+
+    @abstractmethod
+    def request(self, path: str, params: dict) -> bytes:
+        """GET path with the non-None params and return the raw response body."""
+
+    def get_activity_hr_curve(self, id: str) -> HRCurve:
+        """Get activity heart rate curve in JSON or CSV (use .csv ext) format"""
+        params = {}
+        content = self.request(f"/activity/{id}/hr-curve", params)
+        return HR_CURVE_DECODER.decode(content)
+
+    def get_activity_pace_curve(self, id: str, gap: bool | None = None) -> PaceCurve:
+        """Get activity pace curve in JSON or CSV (use .csv ext) format"""
+        params = {
+            "gap": gap,
+        }
+        content = self.request(f"/activity/{id}/pace-curve", params)
+        return PACE_CURVE_DECODER.decode(content)
+
+    def get_activity_power_curve(
+        self, id: str, fatigue: str | None = None
+    ) -> PowerCurve:
+        """Get activity power curve in JSON or CSV (use .csv ext) format"""
+        params = {
+            "fatigue": fatigue,
+        }
+        content = self.request(f"/activity/{id}/power-curve", params)
+        return POWER_CURVE_DECODER.decode(content)
+
+    def get_activity_streams(
+        self,
+        id: str,
+        types: list[str] | None = None,
+        includeDefaults: bool | None = None,
+    ) -> list[ActivityStream]:
+        """List streams for the activity"""
+        params = {
+            "types": join_array(types),
+            "includeDefaults": includeDefaults,
+        }
+        content = self.request(f"/activity/{id}/streams", params)
+        return ACTIVITY_STREAM_LIST_DECODER.decode(content)
+
+    def list_activities(
+        self,
+        id: str,
+        oldest: str,
+        newest: str | None = None,
+        route_id: int | None = None,
+        limit: int | None = None,
+        fields: list[str] | None = None,
+    ) -> list[Activity]:
+        """List activities for a date range in desc date order"""
+        params = {
+            "oldest": oldest,
+            "newest": newest,
+            "route_id": route_id,
+            "limit": limit,
+            "fields": join_array(fields),
+        }
+        content = self.request(f"/athlete/{id}/activities", params)
+        return ACTIVITY_LIST_DECODER.decode(content)
+
+    def list_activity_hr_curves(
+        self,
+        id: str,
+        oldest: str,
+        newest: str,
+        filters: list[ActivityFilter] | None = None,
+        secs: list[int] | None = None,
+        type: str | None = None,
+    ) -> ActivityHRCurvePayload:
+        """Get best HR for a range of durations for matching activities in the date range"""
+        params = {
+            "oldest": oldest,
+            "newest": newest,
+            "filters": join_array(filters),
+            "secs": join_array(secs),
+            "type": type,
+        }
+        content = self.request(f"/athlete/{id}/activity-hr-curves", params)
+        return ACTIVITY_HR_CURVE_PAYLOAD_DECODER.decode(content)
+
+    def list_activity_power_curves(
+        self,
+        id: str,
+        oldest: str,
+        newest: str,
+        filters: list[ActivityFilter] | None = None,
+        secs: list[int] | None = None,
+        type: str | None = None,
+        fatigue: str | None = None,
+    ) -> ActivityPowerCurvePayload:
+        """Get best power for a range of durations for matching activities in the date range"""
+        params = {
+            "oldest": oldest,
+            "newest": newest,
+            "filters": join_array(filters),
+            "secs": join_array(secs),
+            "type": type,
+            "fatigue": fatigue,
+        }
+        content = self.request(f"/athlete/{id}/activity-power-curves", params)
+        return ACTIVITY_POWER_CURVE_PAYLOAD_DECODER.decode(content)
@@ -0,0 +1,12 @@
+import logging
+
+from config import DATA_PATH, settings
+from hclient import HetznerS3Client
+
+logging.basicConfig(level=logging.INFO)
+
+# Objects are mirrored by key, so keep the exports under `polar/` and `strava/`
+# in the bucket and they land in data/polar and data/strava. The loaders read
+# the zips directly (see archive.py), so there is no need to unpack them.
+client = HetznerS3Client(bucket_name=settings.HETZNER_BUCKET_NAME, data_path=DATA_PATH)
+client.mirror(unpack=False)
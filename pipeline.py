@@ -0,0 +1,286 @@
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+import hashlib
+import json
+import logging
+import pickle
+import runpy
+import shutil
+
+import pandas as pd
+
+from archive import ExportArchive
+from config import DATA_PATH, settings
+from features import metric_version, update_polar_features, update_strava_features
+from hclient import MIRROR_MANIFEST, HetznerS3Client, read_manifest
+from iclient import ACTIVITY_HISTORY_START, IntervalsClient
+from plotfunctions import PLOT_PATH, preview_patches, upload_plot_to_s3
+from polar_training import parse_trainings
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent
+PIPELINE_PATH = DATA_PATH / ".pipeline"
+
+
+class Stage:
+    """
+    A step of the pipeline, run once all of its dependencies are done.
+
+    Plain stages call run(inputs). Chunked stages split items(inputs) into
+    chunks and call process(chunk, inputs) for each, saving every chunk result
+    so an interrupted stage resumes at the first missing chunk. inputs maps the
+    dependency names to their results. Editing any of the sources, the code
+    the stage runs, or changing version invalidates its artifact.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deps: list[str] = [],
+        run: Optional[Callable[[dict], Any]] = None,
+        items: Optional[Callable[[dict], list]] = None,
+        process: Optional[Callable[[list, dict], list]] = None,
+        chunk_size: int = 100,
+        version: int | str = 1,
+        always_run: bool = False,
+        sources: list[Path] = [],
+    ):
+        if (run is None) == (items is None or process is None):
+            raise ValueError(f"Stage {name} needs either run or items and process.")
+        self.name = name
+        self.deps = deps
+        self.run = run
+        self.items = items
+        self.process = process
+        self.chunk_size = chunk_size
+        self.version = version
+        self.always_run = always_run
+        self.sources = sources
+
+    def key(self, dep_hashes: dict[str, str]) -> str:
+        source_hashes = {str(path): file_hash(path) for path in self.sources}
+        definition = json.dumps(
+            [self.name, self.version, self.chunk_size, dep_hashes, source_hashes],
+            sort_keys=True,
+        )
+        return hashlib.sha1(definition.encode("utf-8")).hexdigest()[:16]
+
+    def execute(self, inputs: dict, chunk_folder: Path):
+        if self.run is not None:
+            return self.run(inputs)
+
+        items = self.items(inputs)
+        results = []
+        for i, start in enumerate(range(0, len(items), self.chunk_size)):
+            chunk_path = chunk_folder / f"{i:05d}.pkl"
+            if chunk_path.exists():
+                results.extend(read_artifact(chunk_path))
+                continue
+            chunk_result = self.process(items[start : start + self.chunk_size], inputs)
+            write_artifact(chunk_result, chunk_path)
+            results.extend(chunk_result)
+            logger.info(
+                f"{self.name}: chunk {i + 1} of {-(-len(items) // self.chunk_size)} done"
+            )
+        return results
+
+
+def write_artifact(value, path: Path) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(value, f)
+    tmp_path.replace(path)
+    return file_hash(path)
+
+
+def read_artifact(path: Path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def file_hash(path: Path) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class Pipeline:
+    """
+    Runs stages as a DAG, with independent stages running concurrently.
+
+    Every stage result is pickled to path under a key derived from the stage
+    definition and the content hashes of its inputs. A rerun loads a stage
+    from disk when that key is unchanged, so only stages downstream of
+    something that actually changed get recomputed.
+    """
+
+    def __init__(
+        self, stages: list[Stage], path: Path = PIPELINE_PATH, max_workers: int = 4
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        self.path = path
+        self.max_workers = max_workers
+
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown {missing}")
+
+    def run(self) -> dict[str, Any]:
+        results = {}
+        hashes = {}
+        pending = dict(self.stages)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in hashes for dep in stage.deps):
+                        del pending[name]
+                        future = pool.submit(
+                            self.run_stage,
+                            stage,
+                            {dep: results[dep] for dep in stage.deps},
+                            {dep: hashes[dep] for dep in stage.deps},
+                        )
+                        running[future] = name
+
+                if not running:
+                    raise ValueError(f"Cyclic dependencies between {list(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], hashes[name] = future.result()
+
+        return results
+
+    def run_stage(self, stage: Stage, inputs: dict, dep_hashes: dict[str, str]):
+        key = stage.key(dep_hashes)
+        artifact_path = self.path / f"{stage.name}-{key}.pkl"
+
+        if artifact_path.exists() and not stage.always_run:
+            logger.info(f"{stage.name}: up to date")
+            return read_artifact(artifact_path), file_hash(artifact_path)
+
+        logger.info(f"{stage.name}: running")
+        chunk_folder = self.path / f"{stage.name}-{key}.chunks"
+        result = stage.execute(inputs, chunk_folder)
+        content_hash = write_artifact(result, artifact_path)
+
+        # earlier versions of this stage are superseded once the new artifact exists
+        for path in self.path.glob(f"{stage.name}-*"):
+            if path.name.startswith(f"{stage.name}-{key}."):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        shutil.rmtree(chunk_folder, ignore_errors=True)
+
+        return result, content_hash
+
+
+def download(inputs: dict) -> dict:
+    client = HetznerS3Client(
+        bucket_name=settings.HETZNER_BUCKET_NAME, data_path=DATA_PATH
+    )
+    client.mirror(unpack=False)
+    return read_manifest(DATA_PATH / MIRROR_MANIFEST)
+
+
+def polar_training_names(inputs: dict) -> list[str]:
+    with ExportArchive.find(DATA_PATH / "polar") as archive:
+        return sorted(info.filename for info in archive.glob("training-*.json"))
+
+
+def parse_polar_chunk(names: list[str], inputs: dict) -> list:
+    with ExportArchive.find(DATA_PATH / "polar") as archive:
+        return parse_trainings(archive, [archive.zip.getinfo(name) for name in names])
+
+
+def polar_features(inputs: dict) -> pd.DataFrame:
+    with ExportArchive.find(DATA_PATH / "polar") as archive:
+        return update_polar_features(archive)
+
+
+def strava_features(inputs: dict) -> pd.DataFrame:
+    with ExportArchive.find(DATA_PATH / "strava") as archive:
+        with archive.open("activities.csv") as f:
+            df = pd.read_csv(f)
+    return update_strava_features(df)
+
+
+def intervals_activities(inputs: dict) -> list:
+    return IntervalsClient().get_athlete_activities(oldest=ACTIVITY_HISTORY_START)
+
+
+def plots(inputs: dict) -> dict:
+    with preview_patches():
+        namespace = runpy.run_path(str(ROOT / "strava_initial_analysis.py"))
+    return {
+        "prefix": namespace["hprefix"],
+        "plots": {path.name: file_hash(path) for path in PLOT_PATH.glob("*.json")},
+    }
+
+
+def upload_plots(names: list[str], inputs: dict) -> list[str]:
+    for name in names:
+        upload_plot_to_s3(PLOT_PATH / name, prefix=inputs["plots"]["prefix"])
+    return names
+
+
+STAGES = [
+    Stage("download", run=download, always_run=True),
+    Stage(
+        "polar_trainings",
+        deps=["download"],
+        items=polar_training_names,
+        process=parse_polar_chunk,
+        chunk_size=250,
+        sources=[ROOT / "archive.py", ROOT / "polar_training.py"],
+    ),
+    Stage(
+        "polar_features",
+        deps=["download"],
+        run=polar_features,
+        # the metric definitions include HR_REST/HR_MAX from the environment
+        version=metric_version(),
+        sources=[ROOT / "archive.py", ROOT / "features.py", ROOT / "polar_training.py"],
+    ),
+    Stage(
+        "strava_features",
+        deps=["download"],
+        run=strava_features,
+        version=metric_version(),
+        sources=[ROOT / "archive.py", ROOT / "features.py"],
+    ),
+    Stage("intervals", run=intervals_activities, always_run=True),
+    Stage(
+        "plots",
+        deps=["strava_features"],
+        run=plots,
+        sources=[
+            ROOT / "strava_initial_analysis.py",
+            ROOT / "strava_annotate.py",
+            ROOT / "plotfunctions.py",
+        ],
+    ),
+    Stage(
+        "upload",
+        deps=["plots"],
+        items=lambda inputs: sorted(inputs["plots"]["plots"]),
+        process=upload_plots,
+        chunk_size=1,
+    ),
+]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Pipeline(STAGES).run()
@@ -1,10 +1,14 @@
 import plotly.graph_objects as go
 import plotly.io as pio
 from plotly.utils import PlotlyJSONEncoder
+from contextlib import contextmanager
 from pathlib import Path
 import json
+import logging
 from hclient import HetznerS3Client
 
+logger = logging.getLogger(__name__)
+
 
 PLOT_PATH = Path(__file__).parent / "plots"
 SITE_BG = "#0f172a"  # slate-900
@@ -158,8 +162,29 @@ def save_plot_json(fig: go.Figure, name: str, folder: Path = PLOT_PATH):
         json.dump(fig_dict, f, cls=PlotlyJSONEncoder)
 
 
+def upload_plot_to_s3(file: Path, prefix: str = None):
+    object_name = f"{prefix + '-' if prefix else ''}{file.stem}.json"
+    client.upload_file(file, object_name=object_name)
+
+
 def upload_all_plots_to_s3(prefix: str = None):
 
     for file in PLOT_PATH.glob("*.json"):
-        object_name = f"{prefix + '-' if prefix else ''}{file.stem}.json"
-        client.upload_file(file, object_name=object_name)
+        upload_plot_to_s3(file, prefix=prefix)
+
+
+@contextmanager
+def preview_patches():
+    """Keep scripts from opening renderers or uploading to S3 while they are rerun."""
+    global upload_all_plots_to_s3
+    show = go.Figure.show
+    upload = upload_all_plots_to_s3
+    go.Figure.show = lambda self, *args, **kwargs: None
+    upload_all_plots_to_s3 = lambda *args, **kwargs: logger.info(
+        "Skipping upload_all_plots_to_s3"
+    )
+    try:
+        yield
+    finally:
+        go.Figure.show = show
+        upload_all_plots_to_s3 = upload
@@ -0,0 +1,115 @@
+import pandas as pd
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+from shapely.geometry.linestring import LineString
+import logging
+import zipfile
+
+from archive import ExportArchive
+
+
+logger = logging.getLogger(__name__)
+
+
+class SportEnum(Enum):
+    RUNNING = "RUNNING"
+    CYCLING = "CYCLING"
+    SWIMMING = "SWIMMING"
+    ROWING = "ROWING"
+    INDOOR_ROWING = "INDOOR_ROWING"
+    INDOOR_CYCLING = "INDOOR_CYCLING"
+    WEIGHT_TRAINING = "WEIGHT_TRAINING"
+    OTHER = "OTHER"
+    OTHER_INDOOR = "OTHER_INDOOR"
+    STRENGTH_TRAINING = "STRENGTH_TRAINING"
+    OTHER_OUTDOOR = "OTHER_OUTDOOR"
+    HIKING = "HIKING"
+
+
+def parse_duration_h(duration_str: str) -> float:
+    duration_s = float(duration_str.replace("PT", "").replace("S", ""))
+    return duration_s / 3600.0
+
+
+def convert_distance_km(distance_m: float) -> float:
+    if distance_m is None:
+        return 0.0
+    return distance_m / 1000.0
+
+
+def parse_date(date_str: str) -> pd.Timestamp:
+    return pd.to_datetime(date_str)
+
+
+def extract_activity_shape(
+    data: dict, filename: str, distance: float, sport: SportEnum
+) -> Optional[LineString]:
+    try:
+        points = data["exercises"][0]["samples"]["recordedRoute"]
+    except KeyError:
+        logger.warning(
+            f"No recorded route found ({sport.value}: {distance} km) for {filename}, setting activity_shape to None"
+        )
+        points = []
+    activity_shape = LineString(
+        [(point["longitude"], point["latitude"]) for point in points]
+    )
+    return activity_shape
+
+
+class PolarTraining(BaseModel, arbitrary_types_allowed=True):
+    filename: str
+    date: pd.Timestamp
+    name: str
+    sport: SportEnum
+    duration: float
+    distance: float = 0.0
+    kilo_calories: float
+    average_heart_rate: Optional[float] = None
+    max_heart_rate: Optional[float] = None
+    activity_shape: Optional[LineString] = None
+
+    def from_json(data: dict, filename: str):
+        sport = SportEnum(data.get("exercises", [{}])[0].get("sport"))
+        distance = convert_distance_km(data.get("distance"))
+
+        activity_shape = None
+        if (
+            sport
+            in [
+                SportEnum.ROWING,
+                SportEnum.CYCLING,
+                SportEnum.OTHER_OUTDOOR,
+                SportEnum.RUNNING,
+            ]
+            and distance > 0.5
+        ):
+            activity_shape = extract_activity_shape(data, filename, distance, sport)
+        return PolarTraining(
+            filename=filename,
+            date=parse_date(data.get("startTime")),
+            name=data.get("name"),
+            sport=sport,
+            duration=parse_duration_h(data.get("duration")),
+            distance=distance,
+            kilo_calories=data.get("kiloCalories"),
+            average_heart_rate=data.get("averageHeartRate"),
+            max_heart_rate=data.get("maximumHeartRate"),
+            activity_shape=activity_shape,
+        )
+
+
+def parse_trainings(
+    archive: ExportArchive, members: list[zipfile.ZipInfo]
+) -> list[PolarTraining]:
+    parsed_trainings = []
+    for training in members:
+        # the full member path, so trainings from different folders stay apart
+        filename = training.filename
+        try:
+            data = archive.read_json(training)
+            parsed_trainings.append(PolarTraining.from_json(data, filename=filename))
+        except Exception as e:
+            print(f"Error parsing {filename}: {e}")
+    return parsed_trainings
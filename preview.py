@@ -0,0 +1,368 @@
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import ast
+import copy
+import gzip
+import hashlib
+import importlib
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import traceback
+import types
+
+from plotly.offline import get_plotlyjs
+
+from plotfunctions import PLOT_PATH, SITE_BG, preview_patches
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+ROOT = Path(__file__).parent
+DATA_FOLDER = ROOT / "data"
+PREVIEW_SCRIPTS = [ROOT / "strava_initial_analysis.py"]
+WATCH_INTERVAL_S = 0.2
+# only the raw exports; the scripts write their own outputs and caches into
+# data/, and watching those would rerun the scripts forever
+WATCHED_DATA = [DATA_FOLDER / "polar", DATA_FOLDER / "strava"]
+
+INDEX_HTML = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>plots preview</title>
+<script src="/plotly.min.js"></script>
+<style>
+  body { background: %(bg)s; color: #cbd5e1; font-family: Poppins, sans-serif; margin: 2rem; }
+  .plot { max-width: 960px; margin: 0 auto 3rem; }
+  .plot h2 { font-size: 0.8rem; opacity: 0.5; font-weight: normal; }
+</style>
+</head>
+<body>
+<div id="plots"></div>
+<script>
+async function loadPlot(name) {
+  let el = document.getElementById(name);
+  if (!el) {
+    const wrapper = document.createElement("div");
+    wrapper.className = "plot";
+    wrapper.innerHTML = `<h2>${name}</h2>`;
+    el = document.createElement("div");
+    el.id = name;
+    wrapper.appendChild(el);
+    document.getElementById("plots").appendChild(wrapper);
+  }
+  const response = await fetch(`/plots/${name}.json`, { cache: "no-cache" });
+  const fig = await response.json();
+  Plotly.react(el, fig.data, fig.layout, { responsive: true, displayModeBar: false });
+}
+fetch("/plots").then((r) => r.json()).then((names) => names.forEach(loadPlot));
+const events = new EventSource("/events");
+events.addEventListener("plot", (e) => loadPlot(e.data));
+</script>
+</body>
+</html>
+"""
+
+
+def split_cells(source: str) -> list[tuple[int, str]]:
+    """Split a `# %%` script into (first line number, source) cells."""
+    cells = [(0, [])]
+    for lineno, line in enumerate(source.splitlines(keepends=True)):
+        if line.startswith("# %%") and cells[-1][1]:
+            cells.append((lineno, []))
+        cells[-1][1].append(line)
+    return [(lineno, "".join(lines)) for lineno, lines in cells]
+
+
+def imported_modules(source: str) -> set[str]:
+    modules = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split(".")[0])
+    return modules
+
+
+def snapshot(namespace: dict) -> dict:
+    """
+    Deep copy a namespace, so later cells mutating lists, frames or figures in
+    place do not leak into the state a rerun starts from.
+
+    One memo is shared across the values to keep aliases aliased. Modules,
+    dunders and values that cannot be copied are kept by reference.
+    """
+    memo = {}
+    copied = {}
+    for key, value in namespace.items():
+        if key.startswith("__") or isinstance(value, types.ModuleType):
+            copied[key] = value
+            continue
+        try:
+            copied[key] = copy.deepcopy(value, memo)
+        except Exception:
+            copied[key] = value
+    return copied
+
+
+class ScriptRunner:
+    """
+    Re-runs a `# %%` script from its first changed cell.
+
+    The namespace before every cell is kept, so editing a figure cell only
+    re-executes that cell and the ones after it, not the data loading above.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.cells: list[tuple[int, str]] = []
+        self.snapshots: list[dict] = []
+
+    @property
+    def dependencies(self) -> set[str]:
+        return imported_modules(self.path.read_text())
+
+    def run(self, force: bool = False):
+        cells = split_cells(self.path.read_text())
+
+        first = 0
+        if not force:
+            while (
+                first < min(len(cells), len(self.cells))
+                and cells[first] == self.cells[first]
+            ):
+                first += 1
+        if first == len(cells) and len(cells) == len(self.cells):
+            return
+
+        if first < len(self.snapshots):
+            namespace = snapshot(self.snapshots[first])
+        else:
+            first = 0
+            namespace = {"__name__": "__preview__", "__file__": str(self.path)}
+        del self.snapshots[first:]
+        self.cells = cells[:first]
+
+        start = time.perf_counter()
+        with preview_patches():
+            for lineno, cell in cells[first:]:
+                self.snapshots.append(snapshot(namespace))
+                code = compile("\n" * lineno + cell, str(self.path), "exec")
+                try:
+                    exec(code, namespace)
+                except Exception:
+                    logger.error(
+                        f"{self.path.name}:{lineno + 1}\n{traceback.format_exc()}"
+                    )
+                    return
+                self.cells.append((lineno, cell))
+
+        logger.info(
+            f"Ran {self.path.name} from cell {first} in {time.perf_counter() - start:.2f}s"
+        )
+
+
+class Watcher:
+    """Polls data, figure code and plots, and rebuilds in a background worker."""
+
+    def __init__(self, scripts: list[Path]):
+        self.runners = {path: ScriptRunner(path) for path in scripts}
+        self.jobs = queue.Queue()
+        self.listeners: list[queue.Queue] = []
+        self.lock = threading.Lock()
+        self.mtimes = {}
+
+    def subscribe(self) -> queue.Queue:
+        listener = queue.Queue()
+        with self.lock:
+            self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener: queue.Queue):
+        with self.lock:
+            self.listeners.remove(listener)
+
+    def broadcast(self, name: str):
+        with self.lock:
+            for listener in self.listeners:
+                listener.put(name)
+
+    def scan(self) -> dict[Path, int]:
+        files = list(ROOT.glob("*.py")) + list(PLOT_PATH.glob("*.json"))
+        files += [
+            path
+            for folder in WATCHED_DATA
+            for path in folder.rglob("*")
+            if path.is_file()
+        ]
+        mtimes = {}
+        for path in files:
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return mtimes
+
+    def changed(self) -> list[Path]:
+        mtimes = self.scan()
+        changed = [
+            path for path, mtime in mtimes.items() if self.mtimes.get(path) != mtime
+        ]
+        self.mtimes = mtimes
+        return changed
+
+    def watch(self):
+        self.mtimes = self.scan()
+        for runner in self.runners.values():
+            self.jobs.put(lambda runner=runner: runner.run(force=True))
+
+        while True:
+            time.sleep(WATCH_INTERVAL_S)
+            changed = self.changed()
+
+            for path in changed:
+                if path.parent == PLOT_PATH:
+                    self.broadcast(path.stem)
+
+            code = [path for path in changed if path.suffix == ".py"]
+            data_changed = any(path.is_relative_to(DATA_FOLDER) for path in changed)
+
+            modules = set()
+            for path in code:
+                if path in self.runners:
+                    self.jobs.put(self.runners[path].run)
+                elif path.stem in sys.modules:
+                    self.jobs.put(
+                        lambda name=path.stem: importlib.reload(sys.modules[name])
+                    )
+                    modules.add(path.stem)
+
+            for runner in self.runners.values():
+                if data_changed or runner.dependencies & modules:
+                    self.jobs.put(lambda runner=runner: runner.run(force=True))
+
+    def work(self):
+        # scripts and module reloads share one thread, so they never interleave
+        while True:
+            job = self.jobs.get()
+            try:
+                job()
+            except Exception:
+                logger.error(traceback.format_exc())
+
+    def start(self):
+        threading.Thread(target=self.watch, daemon=True).start()
+        threading.Thread(target=self.work, daemon=True).start()
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    watcher: Watcher = None
+    cache: dict = {}
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        if self.path == "/":
+            self.send_body(INDEX_HTML % {"bg": SITE_BG}, "text/html")
+        elif self.path == "/plotly.min.js":
+            self.send_cached(
+                "plotly.min.js", None, get_plotlyjs, "application/javascript"
+            )
+        elif self.path == "/plots":
+            names = sorted(path.stem for path in PLOT_PATH.glob("*.json"))
+            self.send_body(json.dumps(names), "application/json")
+        elif self.path.startswith("/plots/") and self.path.endswith(".json"):
+            path = PLOT_PATH / Path(self.path).name
+            if not path.is_file():
+                self.send_error(404)
+                return
+            stat = path.stat()
+            self.send_cached(
+                path.name,
+                (stat.st_mtime_ns, stat.st_size),
+                path.read_bytes,
+                "application/json",
+            )
+        elif self.path == "/events":
+            self.stream_events()
+        else:
+            self.send_error(404)
+
+    def send_body(self, body: str, content_type: str):
+        encoded = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def send_cached(self, key: str, version, load, content_type: str):
+        """Serve gzipped content with an ETag, answering 304 when the client has it."""
+        cached = self.cache.get(key)
+        if cached is None or cached[0] != version:
+            body = load()
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self.cache[key] = (version, etag, gzip.compress(body, compresslevel=6))
+        _, etag, compressed = self.cache[key]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = compressed
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            body = gzip.decompress(compressed)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        listener = self.watcher.subscribe()
+        try:
+            while True:
+                try:
+                    name = listener.get(timeout=15)
+                    self.wfile.write(f"event: plot\ndata: {name}\n\n".encode("utf-8"))
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except BrokenPipeError, ConnectionResetError:
+            pass
+        finally:
+            self.watcher.unsubscribe(listener)
+
+
+def serve(scripts: list[Path] = PREVIEW_SCRIPTS, host="127.0.0.1", port=8000):
+    watcher = Watcher(scripts)
+    watcher.start()
+    PreviewHandler.watcher = watcher
+
+    server = ThreadingHTTPServer((host, port), PreviewHandler)
+    server.daemon_threads = True
+    logger.info(f"Previewing plots on http://{host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve([ROOT / script for script in sys.argv[1:]] or PREVIEW_SCRIPTS)
@@ -3,6 +3,9 @@ import pandas as pd
 from pathlib import Path
 from plotly import express as px
 
+from archive import ExportArchive
+from features import update_strava_features
+
 from plotfunctions import (
     ACCENT,
     PRIMARY,
@@ -13,17 +16,18 @@ from plotfunctions import (
     SITE_BG,
 )
 
-fp = Path(__file__).parent / "data" / "strava" / "activities.csv"
+STRAVA_FOLDER = Path(__file__).parent / "data" / "strava"
 hprefix = "blog-sportsdata-art"
 # %% load data
-df = pd.read_csv(fp)
+strava_archive = ExportArchive.find(STRAVA_FOLDER)
+with strava_archive.open("activities.csv") as f:
+    df = pd.read_csv(f)
 print(len(df.columns))
 
 # %% parse some columns for plotting
 df["date_parsed"] = pd.to_datetime(df["Activity Date"])
-df["duration_hours"] = df["Elapsed Time"].apply(
-    lambda x: pd.to_timedelta(x, unit="s").total_seconds() / 3600
-)
+features = update_strava_features(df)
+df["duration_hours"] = df["Activity ID"].astype(str).map(features["duration_hours"])
 # replace run of longer than 2 hours as bike ride
 df["Activity Type"] = df.apply(
     lambda row: (